@@ -1,29 +1,28 @@
 """Functions dealing with dictionaries."""
 
+import itertools
 from collections import defaultdict, deque
 from collections.abc import Callable, Hashable, Iterable, Iterator, Mapping
 
 import graphviz
 
 from protocols import HashableSortable
-from supply import distinct
 
 
 def invert[K: Hashable, V: Hashable](d: dict[K,V]) -> dict[V,K]:
     """
     Invert the dictionary.
 
-    If the dict is not injective an arbitrary choice is made.
+    If the dict is not injective, the last key with each value wins.
 
     >>> invert({"one": 1, "pi": 3, "tau": 6.283185307179586})
     {1: 'one', 3: 'pi', 6.283185307179586: 'tau'}
     >>> invert({})
     {}
+    >>> invert({'a': 1, 'b': 2, 'c': 1})
+    {1: 'c', 2: 'b'}
     """
-    inv_d = {}
-    for key, value in d.items():
-        inv_d[value] = key
-    return inv_d
+    return {value: key for key, value in d.items()}
 
 
 def sorted_al[T: HashableSortable](adj_list: dict[T,set[T]]) -> dict[T,list[T]]:
@@ -34,14 +33,11 @@ def sorted_al[T: HashableSortable](adj_list: dict[T,set[T]]) -> dict[T,list[T]]:
     vertices and whose values are sets of their outward neighbors, and returns
     a new, similar dictionary whose values are instead sorted lists.
     """
-    sl = {}
-    for vertex, neighbors in adj_list.items():
-        sl[vertex] = sorted(neighbors)
-    return sl
+    return {vertex: sorted(neighbors) for vertex, neighbors in adj_list.items()}
 
 
 def adjacency[T: Hashable](
-        edges: list[tuple[T,T]], vertices: Iterable[T] = (), *, directed: bool = True,
+        edges: Iterable[tuple[T,T]], vertices: Iterable[T] = (), *, directed: bool = True,
     ) -> dict[T,set[T]]:
     """
     Make an adjacency list.
@@ -74,25 +70,20 @@ def adjacency[T: Hashable](
     ...                     directed=False))
     {'a': ['b', 'c'], 'b': ['a', 'c'], 'c': ['a', 'b'], 'd': [], 'e': []}
     """
-    adj_list = {}
+    adj_list = defaultdict(set)
 
-    for source, dest in edges:
-        if source in adj_list:
+    if directed:
+        for source, dest in edges:
             adj_list[source].add(dest)
-        else:
-            adj_list[source] = {dest}
-
-        if not directed:
-            if dest in adj_list:
-                adj_list[dest].add(source)
-            else:
-                adj_list[dest] = {source}
+    else:
+        for source, dest in edges:
+            adj_list[source].add(dest)
+            adj_list[dest].add(source)
 
     for vertex in vertices:
-        if vertex not in adj_list:
-            adj_list[vertex] = set()
+        adj_list[vertex]
 
-    return adj_list
+    return dict(adj_list)
 
 
 def adjacency_alt[T: Hashable](
@@ -139,6 +130,33 @@ def adjacency_alt[T: Hashable](
     return dict(adj_list)
 
 
+def adjacency_soa[T: Hashable](
+        sources: Iterable[T], dests: Iterable[T], vertices: Iterable[T] = (), *,
+        directed: bool = True,
+    ) -> dict[T,set[T]]:
+    """
+    Make an adjacency list from parallel sequences of sources and destinations.
+
+    This is like adjacency(), but the edges are given as two columns instead
+    of as a list of pairs, for callers that already hold the endpoints as two
+    columns.
+
+    >>> adjacency_soa([], [])
+    {}
+    >>> adjacency_soa(['a', 'b', 'c'], ['b', 'c', 'a'])
+    {'a': {'b'}, 'b': {'c'}, 'c': {'a'}}
+    >>> adjacency_soa('abc', 'bca', ('d','a','e'))
+    {'a': {'b'}, 'b': {'c'}, 'c': {'a'}, 'd': set(), 'e': set()}
+    >>> sorted_al(adjacency_soa('abc', 'bca', directed=False))
+    {'a': ['b', 'c'], 'b': ['a', 'c'], 'c': ['a', 'b']}
+    >>> adjacency_soa('ab', 'a')
+    Traceback (most recent call last):
+      ...
+    ValueError: zip() argument 2 is shorter than argument 1
+    """
+    return adjacency(zip(sources, dests, strict=True), vertices, directed=directed)
+
+
 def draw_graph[T](adj_list: dict[T,set[T]]) -> graphviz.Digraph:
     R"""
     Draw a directed graph.
@@ -155,25 +173,23 @@ def draw_graph[T](adj_list: dict[T,set[T]]) -> graphviz.Digraph:
     }
     """
     g = graphviz.Digraph()
-    for source,targets in adj_list.items():
-        for dest in targets:
-            g.edge(str(source),str(dest))
+    for source, targets in adj_list.items():
+        source_name = str(source)
+        g.edges((source_name, str(dest)) for dest in targets)
     return g
 
 
-# TODO: Modify this to use a comprehension.
-def sorted_setoset[T: HashableSortable](unsorted: set[frozenset[T]]) -> list[list[T]]:
-    """Convert a family of (frozen)sets into a nested list."""
-    unsorted_list = []
-    for collection in unsorted:
-        unsorted_list.append(sorted(collection))  # noqa: PERF401
-    return sorted(unsorted_list)
+def sorted_setoset[T: HashableSortable](unsorted: Iterable[Iterable[T]]) -> list[list[T]]:
+    """Convert a family of (frozen)sets, or other collections, into a nested list."""
+    return sorted(map(sorted, unsorted))
 
 
 def components[T: Hashable](edges: list[tuple[T,T]]) -> set[frozenset[T]]:
     """
     Identify the connected components from an edge list.
 
+    Uses a disjoint-set forest with union by rank and path halving.
+
     >>> components([])
     set()
     >>> edges = [('1','2'), ('1','3'), ('4','5'),
@@ -189,36 +205,69 @@ def components[T: Hashable](edges: list[tuple[T,T]]) -> set[frozenset[T]]:
     >>> edges = [(12,2), (12,3), (4,5), (5,6), (3,7), (2,7)]
     >>> sorted_setoset(components(edges))
     [[2, 3, 7, 12], [4, 5, 6]]
+
+    >>> sorted_setoset(components([('a','a'), ('a','b'), ('c','c')]))
+    [['a', 'b'], ['c']]
+    >>> nan = float('nan')
+    >>> components([(nan, 1), (1, nan)]) == {frozenset({nan, 1})}
+    True
+
+    >>> devious_vertices = map(str, range(1338))
+    >>> components(devious()) == {frozenset(devious_vertices)}
+    True
+    """
+    return {frozenset(component) for component in components_lists(edges)}
+
+
+def components_lists[T: Hashable](edges: list[tuple[T,T]]) -> list[list[T]]:
     """
-    comp_list = []
+    Identify the connected components from an edge list, as lists.
+
+    This is like components(), but it skips freezing (and thus hashing) each
+    component, for callers that only need to iterate over them.
+
+    >>> components_lists([])
+    []
+    >>> edges = [('1','2'), ('1','3'), ('4','5'),
+    ...          ('5','6'), ('3','7'), ('2','7')]
+    >>> sorted_setoset(components_lists(edges))
+    [['1', '2', '3', '7'], ['4', '5', '6']]
+    """
+    parents = {}
+    ranks = {}
+
+    def find(elem: T) -> T:
+        # Path halving: point every other node on the path at its grandparent.
+        # Roots are compared by identity, so vertices like NaN that are not
+        # equal to themselves still terminate.
+        while (parent := parents[elem]) is not elem:
+            grandparent = parents[parent]
+            parents[elem] = grandparent
+            elem = grandparent
+        return elem
+
+    def union(u: T, v: T) -> None:
+        u = find(u)
+        v = find(v)
+        if u is v:
+            return
+        if ranks[u] < ranks[v]:
+            u, v = v, u
+        parents[v] = u
+        if ranks[u] == ranks[v]:
+            ranks[u] += 1
+
     for a, b in edges:
-        found = None
-        for n, component in enumerate(comp_list):
-            if a in component and b not in component:
-                component.add(b)
-                if found is None:
-                    found = n
-                else:
-                    comp_list[found] |= component
-                    del comp_list[n]
-                    break
-            elif a not in component and b in component:
-                component.add(a)
-                if found is None:
-                    found = n
-                else:
-                    comp_list[found] |= component
-                    del comp_list[n]
-                    break
-            elif a in component and b in component:
-                found = n
-                break
-        if found is None:
-            comp_list.append({a,b})
-    comp_set = set()
-    for component in comp_list:
-        comp_set.add(frozenset(component))
-    return comp_set
+        for vertex in a, b:
+            parents.setdefault(vertex, vertex)
+            ranks.setdefault(vertex, 0)
+        if a is not b:  # A self-loop only introduces its vertex.
+            union(a, b)
+
+    comp_lists = {}
+    for vertex in parents:
+        comp_lists.setdefault(find(vertex), []).append(vertex)
+    return list(comp_lists.values())
 
 
 def components_d[T: Hashable](
@@ -250,21 +299,8 @@ def _setofsets[K: Hashable, T: Hashable](
         set_dict: Mapping[K,Iterable[T]],
     ) -> set[frozenset[T]]:
     """Make a set of frozensets (components_d must assure preconditions)."""
-    vals = set()
-    for val in distinct(set_dict.values(), key=id):
-        vals.add(frozenset(val))
-    return vals
-
-
-def _setofsets_alt[K: Hashable, T: Hashable](
-        set_dict: Mapping[K,Iterable[T]],
-    ) -> set[frozenset[T]]:
-    """Make a set of frozensets (like _setofsets, same preconditions)."""
-    list_of_sets = distinct(set_dict.values(), key=id)
-    return set(map(frozenset, list_of_sets))
-
-
-# TODO: Make a third version of _setofsets that uses a comprehension.
+    unique = {id(val): val for val in set_dict.values()}
+    return {frozenset(val) for val in unique.values()}
 
 
 def components_dict[T: Hashable](
@@ -273,7 +309,9 @@ def components_dict[T: Hashable](
     """
     Identify the connected components from an edge list.
 
-    Approximately uses the quick-find algorithm.
+    Approximately uses the quick-find algorithm. Each vertex maps to the list of
+    vertices in its component; vertices in the same component share the same
+    list object.
 
     >>> components_dict([])
     {}
@@ -281,19 +319,34 @@ def components_dict[T: Hashable](
     ...          ('5','6'), ('3','7'), ('2','7')]
     >>> sorted_setoset(_setofsets(components_dict(edges)))
     [['1', '2', '3', '7'], ['4', '5', '6']]
+    >>> sorted_setoset(_setofsets(components_dict([('a','a'), ('c','c'), ('c','a')])))
+    [['a', 'c']]
+    >>> comp_dict = components_dict([('a','b'), ('b','c'), ('c','d')], 'e')
+    >>> comp_dict['a'] is comp_dict['d'], sorted(comp_dict['a']), comp_dict['e']
+    (True, ['a', 'b', 'c', 'd'], ['e'])
+    >>> nan = float('nan')
+    >>> _setofsets(components_dict([(nan, 1), (1, nan)])) == {frozenset({nan, 1})}
+    True
     """
     comp_dict = {}
     for u, v in edges:
         if u in comp_dict and v in comp_dict:
             if comp_dict[u] is not comp_dict[v]:
-                small, big = (u,v) if len(comp_dict[u]) < len(comp_dict[v]) else (v,u)
+                if len(comp_dict[u]) < len(comp_dict[v]):
+                    small, big = u, v
+                else:
+                    small, big = v, u
                 comp_dict[big] += comp_dict[small]
                 for elm in comp_dict[small]:
                     comp_dict[elm] = comp_dict[big]
         elif u in comp_dict:
             comp_dict[u].append(v)
+            comp_dict[v] = comp_dict[u]
         elif v in comp_dict:
             comp_dict[v].append(u)
+            comp_dict[u] = comp_dict[v]
+        elif u is v:
+            comp_dict[u] = [u]
         else:
             comp_dict[u] = [u,v]
             comp_dict[v] = comp_dict[u]
@@ -331,7 +384,10 @@ def components_dict_alt[T: Hashable](
 
     for u, v in edges:
         if comp_dict[u] is not comp_dict[v]:
-            small, big = (u,v) if len(comp_dict[u]) < len(comp_dict[v]) else (v,u)
+            if len(comp_dict[u]) < len(comp_dict[v]):
+                small, big = u, v
+            else:
+                small, big = v, u
             comp_dict[big] += comp_dict[small]
             for elm in comp_dict[small]:
                 comp_dict[elm] = comp_dict[big]
@@ -363,7 +419,10 @@ def components_dict_alt2[T: Hashable](
 
     for u, v in edges:
         if comp_dict[u][0] != comp_dict[v][0]:
-            small, big = (u,v) if len(comp_dict[u]) < len(comp_dict[v]) else (v,u)
+            if len(comp_dict[u]) < len(comp_dict[v]):
+                small, big = u, v
+            else:
+                small, big = v, u
             comp_dict[big] += comp_dict[small]
             for elm in comp_dict[small]:
                 comp_dict[elm] = comp_dict[big]
@@ -394,17 +453,29 @@ def components_dfs[T: Hashable](
     >>> edges = [(12,2), (12,3), (4,5), (5,6), (3,7), (2,7)]
     >>> sorted_setoset(components_dfs(edges))
     [[2, 3, 7, 12], [4, 5, 6]]
+
+    >>> devious_vertices = map(str, range(1338))
+    >>> components_dfs(devious()) == {frozenset(devious_vertices)}
+    True
     """
     adj_list = adjacency(edges, vertices, directed=False)
     comp_set = set()
     visited = set()
 
     def explore(source: T, action: Callable[[T], None]) -> None:
-        visited.add(source)
-        action(source)
-        for dest in adj_list[source]:
-            if dest not in visited:
-                explore(dest, action)
+        mark_visited = visited.add
+        stack = [source]
+        push = stack.append
+        pop = stack.pop
+
+        mark_visited(source)
+        while stack:
+            node = pop()
+            action(node)
+            for dest in adj_list[node]:
+                if dest not in visited:
+                    mark_visited(dest)
+                    push(dest)
 
     for node in adj_list:
         if node not in visited:
@@ -458,21 +529,24 @@ def components_dfs_alt[T: Hashable](
     return comp_set
 
 
-# TODO: Modify this for arbitrary recursion limits, and to use a comprehension.
-def devious() -> list[tuple[str,str]]:
+def devious(n: int = 1337) -> list[tuple[str,str]]:
     """
-    Create a list of edges that defeats components_dfs.
+    Create a list of edges that defeats components_dfs_alt.
 
-    >>> components_dfs(devious())
+    The edges form a chain of n edges through the vertices '0' to str(n). Pass
+    a larger n to exceed a raised recursion limit, or to stress-test the
+    iterative algorithms.
+
+    >>> components_dfs_alt(devious())
     Traceback (most recent call last):
       ...
     RecursionError: maximum recursion depth exceeded
+    >>> devious(3)
+    [('0', '1'), ('1', '2'), ('2', '3')]
+    >>> devious(0)
+    []
     """
-    edges = []
-    labels = range(1337)
-    for index in labels:
-        edges.append((str(index),str(index+1)))  # noqa: PERF401
-    return edges
+    return list(itertools.pairwise(map(str, range(n + 1))))
 
 
 def components_dfs_iter[T: Hashable](
@@ -481,7 +555,7 @@ def components_dfs_iter[T: Hashable](
     """
     Identify the connected components from an edge list.
 
-    This is like components_dfs(), but it tolerates even graphs that would
+    This is like components_dfs_alt(), but it tolerates even graphs that would
     cause it to fail with RecursionError (i.e., graphs with long chains).
 
     >>> components_dfs_iter([])
@@ -562,13 +636,16 @@ def components_bfs[T: Hashable](
 
     def explore(start: T) -> list[T]:
         component = [start]
-        visited.add(start)
+        append = component.append
+        mark_visited = visited.add
+
+        mark_visited(start)
         i = 0
         while i < len(component):
             for node in adj_list[component[i]]:
                 if node not in visited:
-                    component.append(node)
-                    visited.add(node)
+                    append(node)
+                    mark_visited(node)
             i += 1
         return component
 
@@ -25,16 +25,23 @@ def distinct(values, *, key=None):
     >>> distinct([ {1,2}, {1}, {2,2,1}, {2}, {1,1,1}], key=frozenset)
     [{1, 2}, {1}, {2}]
     """
-    if key is None:
-        key = identity_function
-
     val_list = []
     val_set = set()
+    append_val = val_list.append
+    add_key = val_set.add
+
+    if key is None:
+        for val in values:
+            if val not in val_set:
+                add_key(val)
+                append_val(val)
+    else:
+        for val in values:
+            val_key = key(val)
+            if val_key not in val_set:
+                add_key(val_key)
+                append_val(val)
 
-    for val in values:
-        if key(val) not in val_set:
-            val_set.add(key(val))
-            val_list.append(val)
     return val_list
 
 